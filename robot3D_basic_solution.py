@@ -2,7 +2,38 @@
 # coding: utf-8
 
 
+import math
+
 from vedo import *
+from vtkmodules.vtkCommonMath import vtkMatrix4x4
+
+try:
+	from numba import njit
+except ImportError:
+	# Numba is optional: without it the numeric core runs as plain NumPy
+	def njit(*args, **kwargs):
+		if len(args) == 1 and callable(args[0]):
+			return args[0]
+		return lambda f: f
+	_HAVE_NUMBA = False
+else:
+	_HAVE_NUMBA = True
+
+
+# Degrees to radians
+_DEG2RAD = math.pi / 180.0
+
+# Meshes are built once and cloned on every subsequent request
+_FRAME_MESH_TEMPLATES = {}
+_LINK_MESH_TEMPLATE = None
+_JOINT_MESH_TEMPLATE = None
+_AXES = None
+
+# Forward kinematics specialized by make_fk, per (L1, L2, L3)
+_FK_FUNCTIONS = {}
+
+# One vtkMatrix4x4 per frame, updated in place by fk_build_meshes
+_FRAME_VTK_MATRICES = [vtkMatrix4x4() for _ in range(4)]
 
 def RotationMatrix(theta, axis_name):
 	""" calculate single rotation of $theta$ matrix around x,y or z
@@ -14,8 +45,8 @@ def RotationMatrix(theta, axis_name):
 		3x3 rotation matrix
 	"""
 
-	c = np.cos(theta * np.pi / 180)
-	s = np.sin(theta * np.pi / 180)
+	c = math.cos(theta * _DEG2RAD)
+	s = math.sin(theta * _DEG2RAD)
 
 	if axis_name =='x':
 		rotation_matrix = np.array([[1, 0,  0],
@@ -32,14 +63,22 @@ def RotationMatrix(theta, axis_name):
 	return rotation_matrix
 
 
-def createCoordinateFrameMesh():
+def createCoordinateFrameMesh(res=6):
 	"""Returns the mesh representing a coordinate frame
 	Args:
-	  No input args
+	  res: resolution of the arrows (number of sides of the shafts)
 	Returns:
 	  F: vedo.mesh object (arrows for axis)
 	  
 	"""         
+	if res not in _FRAME_MESH_TEMPLATES:
+		_FRAME_MESH_TEMPLATES[res] = _buildCoordinateFrameMesh(res)
+		
+	return _FRAME_MESH_TEMPLATES[res].clone()
+
+
+def _buildCoordinateFrameMesh(res):
+	"""Builds the coordinate frame mesh from scratch (see createCoordinateFrameMesh)"""
 	_shaft_radius = 0.05
 	_head_radius = 0.10
 	_alpha = 1
@@ -52,43 +91,79 @@ def createCoordinateFrameMesh():
 						shaft_radius=_shaft_radius,
 						head_radius=_head_radius,
 						head_length=None,
-						res=12,
-						c='red',
-						alpha=_alpha)
-
-	# y-axis as an arrow  
-	y_axisArrow = Arrow(start_pt=(0, 0, 0),
-						end_pt=(0, 1, 0),
-						s=None,
-						shaft_radius=_shaft_radius,
-						head_radius=_head_radius,
-						head_length=None,
-						res=12,
-						c='green',
-						alpha=_alpha)
+						res=res)
 
-	# z-axis as an arrow  
-	z_axisArrow = Arrow(start_pt=(0, 0, 0),
-						end_pt=(0, 0, 1),
-						s=None,
-						shaft_radius=_shaft_radius,
-						head_radius=_head_radius,
-						head_length=None,
-						res=12,
-						c='blue',
-						alpha=_alpha)
+	# y- and z-axis arrows are rotated copies of the x-axis arrow
+	y_axisArrow = x_axisArrow.clone().rotate_z(90, around=(0, 0, 0))
+	z_axisArrow = x_axisArrow.clone().rotate_y(-90, around=(0, 0, 0))
 	
 	originDot = Sphere(pos=[0,0,0], 
-					   c="black", 
-					   r=0.10)
+					   r=0.10,
+					   res=8,
+					   quads=False)
 
 
 	# Combine the axes together to form a frame as a single mesh object 
-	F = x_axisArrow + y_axisArrow + z_axisArrow + originDot
+	F = merge(x_axisArrow, y_axisArrow, z_axisArrow, originDot)
+	
+	# Color each part through a per-cell RGBA array (red, green, blue, black)
+	_colors = np.array([[255,   0,   0, 255],
+						[  0, 255,   0, 255],
+						[  0,   0, 255, 255],
+						[  0,   0,   0, 255]], dtype=np.uint8)
+	_ncells = [x_axisArrow.ncells, y_axisArrow.ncells, z_axisArrow.ncells, originDot.ncells]
+	F.cellcolors = np.repeat(_colors, _ncells, axis=0)
+	F.alpha(_alpha)
 		
 	return F
 
 
+def createLinkMesh(L, color):
+	"""Returns the mesh representing a link of the arm
+	Args:
+	  L: length of the link
+	  color: color of the link
+	Returns:
+	  vedo.Cylinder object along the x-axis of its local frame
+	  
+	"""
+	global _LINK_MESH_TEMPLATE
+	
+	# Unit-length cylinder spanning x in [0, 1]
+	if _LINK_MESH_TEMPLATE is None:
+		_LINK_MESH_TEMPLATE = Cylinder(r=0.4, 
+									   height=1.0, 
+									   pos = (0.5,0,0),
+									   alpha=.8, 
+									   axis=(1,0,0)
+									   )
+	
+	# Stretch it to length L and shift it past the joint sphere 
+	S = np.eye(4)
+	S[0, 0] = L
+	S[0, 3] = 0.4
+	
+	link_mesh = _LINK_MESH_TEMPLATE.clone().apply_transform(LinearTransform(S))
+	
+	return link_mesh.color(color)
+
+
+def createJointMesh():
+	"""Returns the mesh representing a joint of the arm
+	Args:
+	  No input args
+	Returns:
+	  vedo.Sphere object centered at the origin of its local frame
+	  
+	"""
+	global _JOINT_MESH_TEMPLATE
+	
+	if _JOINT_MESH_TEMPLATE is None:
+		_JOINT_MESH_TEMPLATE = Sphere(r=0.4).pos(0,0,0).color("gray").alpha(.8)
+		
+	return _JOINT_MESH_TEMPLATE.clone()
+
+
 def getLocalFrameMatrix(R_ij, t_ij): 
 	"""Returns the matrix representing the local frame
 	Args:
@@ -98,12 +173,145 @@ def getLocalFrameMatrix(R_ij, t_ij):
 	  T_ij: Matrix of Frame j w.r.t. Frame i. 
 	  
 	"""             
-	# Rigid-body transformation [ R t ]
-	T_ij = np.block([[R_ij,                t_ij],
-					 [np.zeros((1, 3)),       1]])
+	# Rigid-body transformation [ R t ], in the precision of the inputs
+	T_ij = np.empty((4, 4), dtype=np.result_type(np.asarray(R_ij), np.asarray(t_ij), np.float32))
+	T_ij[:3, :3] = R_ij
+	T_ij[:3, 3]  = np.ravel(t_ij)
+	T_ij[3, :3]  = 0.0
+	T_ij[3, 3]   = 1.0
 	
 	return T_ij
 
+# Numeric core of the forward kinematics. Frames are composed as plain 
+# 4x4 ndarrays (np.matmul/einsum or the compiled _matmul4): rotation 
+# classes such as scipy.spatial.transform.Rotation are several times 
+# slower for such small compositions and must not be used here.
+
+@njit(cache=True, fastmath=True)
+def _localFrameMatrixZ(phi, tx, ty, out):
+	"""Writes into out the matrix of a frame rotated by phi (degrees) 
+	around z and translated by (tx, ty, 0) w.r.t. the previous frame
+	"""
+	r = phi * _DEG2RAD
+	c = math.cos(r)
+	s = math.sin(r)
+	
+	out[0, 0] = c
+	out[0, 1] = -s
+	out[0, 2] = 0.0
+	out[0, 3] = tx
+	out[1, 0] = s
+	out[1, 1] = c
+	out[1, 2] = 0.0
+	out[1, 3] = ty
+	out[2, 0] = 0.0
+	out[2, 1] = 0.0
+	out[2, 2] = 1.0
+	out[2, 3] = 0.0
+	out[3, 0] = 0.0
+	out[3, 1] = 0.0
+	out[3, 2] = 0.0
+	out[3, 3] = 1.0
+	return out
+
+
+@njit(cache=True, fastmath=True)
+def _matmul4(A, B, out):
+	"""Writes into out the product of two 4x4 matrices"""
+	for i in range(4):
+		for j in range(4):
+			acc = 0.0
+			for k in range(4):
+				acc += A[i, k] * B[k, j]
+			out[i, j] = acc
+	return out
+
+if not _HAVE_NUMBA:
+	# The explicit loops only pay off once compiled
+	_matmul4 = np.matmul
+
+
+def _linkOffsets(L1, L2, L3):
+	"""Returns the (x, y) origin of each frame w.r.t. the previous frame"""
+	return np.array([[3.0,      2.0],
+					 [L1 + 0.8, 0.0],
+					 [L2 + 0.8, 0.0],
+					 [L3 + 0.4, 0.0]])
+
+
+def _asJointAngles(Phi):
+	"""Returns Phi as a float64 array of the four joint angles. 
+	The compiled chain does no bounds checking, so the shape is checked here.
+	"""
+	Phi = np.asarray(Phi, dtype=np.float64)
+	
+	if Phi.shape != (4,):
+		raise ValueError("Phi must contain exactly four joint angles, got shape %s" % (Phi.shape,))
+		
+	return Phi
+
+
+@njit(cache=True, fastmath=True)
+def _fk_chain(Phi, offsets, T_local):
+	"""Chains the four z-rotation frames placed at the given offsets.
+	T_local is a 4x4 scratch buffer reused for every local frame matrix.
+	"""
+	# All four local-to-global matrices live in one contiguous block, 
+	# T[k] being the matrix of Frame k+1 w.r.t. Frame 0
+	T = np.empty((4, 4, 4), dtype=np.float32)
+	
+	_localFrameMatrixZ(Phi[0], offsets[0, 0], offsets[0, 1], T[0])
+	for k in range(1, 4):
+		_matmul4(T[k - 1], _localFrameMatrixZ(Phi[k], offsets[k, 0], offsets[k, 1], T_local), T[k])
+	
+	# The end-effector's position is the translation column of T_04
+	e = T[3, :3, 3].copy()
+	
+	return T[0], T[1], T[2], T[3], e
+
+
+def fk_numeric(Phi, L1, L2, L3):
+	"""Calculate the local-to-global frame matrices and the location 
+	of the end-effector, without building any meshes.
+	
+	Args:
+	Phi (4x1 nd.array): Array containing the four joint angles (degrees)
+	L1, L2, L3 (float): lengths of the links of the robot arm
+	Returns:
+	T_01, T_02, T_03, T_04: 4x4 nd.arrays of local-to-global matrices for each frame.
+	e: 3x1 nd.array of 3-D coordinates, to location of the end-effector in space.
+	"""
+	# Reuse the offsets and scratch buffer of arms already seen
+	key = (L1, L2, L3)
+	
+	if key not in _FK_FUNCTIONS:
+		_FK_FUNCTIONS[key] = make_fk(L1, L2, L3)
+		
+	return _FK_FUNCTIONS[key](Phi)
+
+
+def make_fk(L1, L2, L3):
+	"""Returns the forward kinematics of an arm with fixed link lengths.
+	
+	The link offsets and the scratch buffer of the local frame matrices 
+	are allocated once, so the returned function only has to evaluate 
+	the joint rotations and chain the frames. It is not thread-safe; 
+	make one function per thread.
+	
+	Args:
+	L1, L2, L3 (float): lengths of the links of the robot arm
+	Returns:
+	fk: function mapping Phi to (T_01, T_02, T_03, T_04, e), as fk_numeric
+	"""
+	offsets = _linkOffsets(L1, L2, L3)
+	T_local = np.empty((4, 4), dtype=np.float32)
+	
+	def fk(Phi):
+		return _fk_chain(_asJointAngles(Phi), offsets, T_local)
+	
+	return fk
+
+
 def forward_kinematics(Phi, L1, L2, L3, L4):
 	"""Calculate the local-to-global frame matrices,	
 	and	the	location of	the	end-effector.
@@ -115,234 +323,172 @@ def forward_kinematics(Phi, L1, L2, L3, L4):
 	T_01, T_02, T_03, T_04: 4x4	nd.arrays of local-to-global matrices												for	each frame.		
 	e: 3x1 nd.array	of 3-D coordinates, to location	of the end-effector	in	space.
 	"""
-	# Matrix of Frame 1 (written w.r.t. Frame 0, which is the previous frame) 
-	R_01 = RotationMatrix(Phi[0], axis_name = 'z')   # Rotation matrix
-	p1   = np.array([[3],[2], [0.0]])              # Frame's origin (w.r.t. previous frame)
-	t_01 = p1                                      # Translation vector
-	
-	T_01 = getLocalFrameMatrix(R_01, t_01)         # Matrix of Frame 1 w.r.t. Frame 0 (i.e., the world frame)
-	
-	# Create the coordinate frame mesh and transform
-	Frame1Arrows = createCoordinateFrameMesh()
-	
-	# Now, let's create a cylinder and add it to the local coordinate frame
-	link1_mesh = Cylinder(r=0.4, 
-						  height=L1, 
-						  pos = ((L1/2)+0.4,0,0),
-						  c="yellow", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
-	
-	# Also create a sphere to show as an example of a joint
-	r1 = 0.4
-	sphere1 = Sphere(r=r1).pos(0,0,0).color("gray").alpha(.8)
+	return fk_numeric(Phi, L1, L2, L3)
 
-	# Combine all parts into a single object 
-	Frame1 = Frame1Arrows + link1_mesh + sphere1
 
-	# Transform the part to position it at its correct location and orientation 
-	Frame1.apply_transform(T_01)  
-	
-	# Matrix of Frame 2 (written w.r.t. Frame 1, which is the previous frame) 	
-	R_12 = RotationMatrix(Phi[1], axis_name = 'z')   # Rotation matrix
-	p2   = np.array([[L1 + 0.8],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_12 = p2                                      # Translation vector
-	
-	# Matrix of Frame 2 w.r.t. Frame 1 
-	T_12 = getLocalFrameMatrix(R_12, t_12)
+def forward_kinematics_batch(Phi, Ls):
+	"""Calculate the local-to-global frame matrices and the location of 
+	the end-effector for a whole trajectory of joint angles at once.
 	
-	# Matrix of Frame 2 w.r.t. Frame 0 (i.e., the world frame)
-	T_02 = T_01 @ T_12
-	
-	# Create the coordinate frame mesh and transform
-	Frame2Arrows = createCoordinateFrameMesh()
+	Args:
+	Phi (Bx4 nd.array): Array containing the four joint angles of B samples, 
+		one sample per row (a single sample must be passed as a 1x4 array)
+	Ls: L1, L2, L3 lengths of the links of the robot arm
+	Returns:
+	T: Bx4x4x4 nd.array, T[b, k] is the local-to-global matrix of Frame k+1 for sample b
+	e: Bx3 nd.array of the end-effector location of each sample
+	"""
+	Phi = np.asarray(Phi, dtype=np.float64)
 	
-	# Now, let's create a cylinder and add it to the local coordinate frame
-	link2_mesh = Cylinder(r=0.4, 
-						  height=L2, 
-						  pos = ((L2/2)+0.4,0,0),
-						  c="red", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
+	if Phi.ndim != 2 or Phi.shape[1] != 4:
+		raise ValueError("Phi must be a Bx4 array of joint angles, got shape %s" % (Phi.shape,))
 	
-	r2 = 0.4
-	sphere2 = Sphere(r=r2).pos(0,0,0).color("gray").alpha(.8)
-
-	# Combine all parts into a single object 
-	Frame2 = Frame2Arrows + link2_mesh + sphere2
+	r = Phi * _DEG2RAD
+	C = np.cos(r)
+	S = np.sin(r)
 	
-	# Transform the part to position it at its correct location and orientation 
-	Frame2.apply_transform(T_02)  
+	# Local matrices of every frame w.r.t. the previous one, for every sample
+	T_local = np.zeros((len(Phi), 4, 4, 4), dtype=np.float32)
+	T_local[..., 0, 0] = C
+	T_local[..., 0, 1] = -S
+	T_local[..., 1, 0] = S
+	T_local[..., 1, 1] = C
+	T_local[..., 2, 2] = 1.0
+	T_local[..., 3, 3] = 1.0
+	T_local[..., :2, 3] = _linkOffsets(*Ls)
 	
-	# Matrix of Frame 3 (written w.r.t. Frame 2, which is the previous frame) 	
-	R_23 = RotationMatrix(Phi[2], axis_name = 'z')   # Rotation matrix
-	p3   = np.array([[L2 +0.8],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_23 = p3                                      # Translation vector
+	# Prefix products along the chain, all samples at once
+	T = np.empty_like(T_local)
+	T[:, 0] = T_local[:, 0]
+	for k in range(1, 4):
+		T[:, k] = np.einsum('bij,bjk->bik', T[:, k - 1], T_local[:, k])
 	
-	# Matrix of Frame 3 w.r.t. Frame 2 
-	T_23 = getLocalFrameMatrix(R_23, t_23)
+	# The end-effector's position is the translation column of T_04
+	e = T[:, 3, :3, 3].copy()
 	
-	T_03 = T_01 @ T_12 @ T_23
-
-	Frame3Arrows = createCoordinateFrameMesh()
+	return T, e
 
-	link3_mesh = Cylinder(r=0.4, 
-						  height=L3, 
-						  pos = ((L3/2)+0.4,0,0),
-						  c="green", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
 
-	r3 = 0.4
-	sphere3 = Sphere(r=r3).pos(0,0,0).color("gray").alpha(.8)
-
-	Frame3 = Frame3Arrows + link3_mesh + sphere3
+def toVtkMatrix4x4(T, out=None):
+	"""Returns the 4x4 matrix T as a vtkMatrix4x4
+	Args:
+	  T: 4x4 nd.array
+	  out: optional vtkMatrix4x4 to update in place
+	Returns:
+	  vtkMatrix4x4 with the elements of T
+	  
+	"""
+	M = vtkMatrix4x4() if out is None else out
 	
-	# Transform the part to position it at its correct location and orientation 
-	Frame3.apply_transform(T_03)  
-
-
-	R_34 = RotationMatrix(Phi[3], axis_name = 'z')   # Rotation matrix
-	p4   = np.array([[L3 +0.4],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_34 = p4
-
-	T_34 = getLocalFrameMatrix(R_34, t_34)
-
-	T_04 = T_01 @ T_12 @ T_23 @ T_34
-
-	# The end-effector's position in homogeneous coordinates
-	e = (T_04 @ np.array([[0], [0], [0], [1]]))[:3].flatten()
-
-	return T_01, T_02, T_03, T_04, e
+	# A single copy of the 16 elements, instead of one SetElement() per element
+	M.DeepCopy(np.ravel(T).tolist())
 	
-def main():
+	return M
 
-	# Set the limits of the graph x, y, and z ranges 
-	axes = Axes(xrange=(0,20), yrange=(-2,20), zrange=(0,6))
 
-	# Lengths of arm parts 
-	L1 = 5   # Length of link 1
-	L2 = 8   # Length of link 2
-	L3 = 3
-
-	# Joint angles 
-	phi1 = 30     # Rotation angle of part 1 in degrees
-	phi2 =-50    # Rotation angle of part 2 in degrees
-	phi3 = -30      # Rotation angle of the end-effector in degrees
-	phi4 = 0
+def fk_build_meshes(transforms, Ls):
+	"""Builds the meshes of the robot arm placed by the frame matrices.
 	
-	# Matrix of Frame 1 (written w.r.t. Frame 0, which is the previous frame) 
-	R_01 = RotationMatrix(phi1, axis_name = 'z')   # Rotation matrix
-	p1   = np.array([[3],[2], [0.0]])              # Frame's origin (w.r.t. previous frame)
-	t_01 = p1                                      # Translation vector
-	
-	T_01 = getLocalFrameMatrix(R_01, t_01)         # Matrix of Frame 1 w.r.t. Frame 0 (i.e., the world frame)
+	Args:
+	transforms: T_01, T_02, T_03, T_04 local-to-global matrices (e.g., from forward_kinematics)
+	Ls: L1, L2, L3 lengths of the links of the robot arm
+	Returns:
+	Frame1, Frame2, Frame3, Frame4: vedo objects of each frame, in world coordinates
+	"""
+	T_01, T_02, T_03, T_04 = transforms
+	L1, L2, L3 = Ls
 	
 	# Create the coordinate frame mesh and transform
 	Frame1Arrows = createCoordinateFrameMesh()
 	
 	# Now, let's create a cylinder and add it to the local coordinate frame
-	link1_mesh = Cylinder(r=0.4, 
-						  height=L1, 
-						  pos = ((L1/2)+0.4,0,0),
-						  c="yellow", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
+	link1_mesh = createLinkMesh(L1, "yellow")
 	
 	# Also create a sphere to show as an example of a joint
-	r1 = 0.4
-	sphere1 = Sphere(r=r1).pos(0,0,0).color("gray").alpha(.8)
+	sphere1 = createJointMesh()
 
 	# Combine all parts into a single object 
 	Frame1 = Frame1Arrows + link1_mesh + sphere1
 
 	# Transform the part to position it at its correct location and orientation 
-	Frame1.apply_transform(T_01)  
-	
-	# Matrix of Frame 2 (written w.r.t. Frame 1, which is the previous frame) 	
-	R_12 = RotationMatrix(phi2, axis_name = 'z')   # Rotation matrix
-	p2   = np.array([[L1 + 0.8],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_12 = p2                                      # Translation vector
-	
-	# Matrix of Frame 2 w.r.t. Frame 1 
-	T_12 = getLocalFrameMatrix(R_12, t_12)
-	
-	# Matrix of Frame 2 w.r.t. Frame 0 (i.e., the world frame)
-	T_02 = T_01 @ T_12
+	Frame1.apply_transform(LinearTransform(toVtkMatrix4x4(T_01, out=_FRAME_VTK_MATRICES[0])))  
 	
 	# Create the coordinate frame mesh and transform
 	Frame2Arrows = createCoordinateFrameMesh()
 	
 	# Now, let's create a cylinder and add it to the local coordinate frame
-	link2_mesh = Cylinder(r=0.4, 
-						  height=L2, 
-						  pos = ((L2/2)+0.4,0,0),
-						  c="red", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
+	link2_mesh = createLinkMesh(L2, "red")
 	
-	r2 = 0.4
-	sphere2 = Sphere(r=r2).pos(0,0,0).color("gray").alpha(.8)
+	sphere2 = createJointMesh()
 
 	# Combine all parts into a single object 
 	Frame2 = Frame2Arrows + link2_mesh + sphere2
 	
 	# Transform the part to position it at its correct location and orientation 
-	Frame2.apply_transform(T_02)  
-	
-	# Matrix of Frame 3 (written w.r.t. Frame 2, which is the previous frame) 	
-	R_23 = RotationMatrix(phi3, axis_name = 'z')   # Rotation matrix
-	p3   = np.array([[L2 +0.8],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_23 = p3                                      # Translation vector
-	
-	# Matrix of Frame 3 w.r.t. Frame 2 
-	T_23 = getLocalFrameMatrix(R_23, t_23)
-	
-	T_03 = T_01 @ T_12 @ T_23
+	Frame2.apply_transform(LinearTransform(toVtkMatrix4x4(T_02, out=_FRAME_VTK_MATRICES[1])))  
 
 	Frame3Arrows = createCoordinateFrameMesh()
 
-	link3_mesh = Cylinder(r=0.4, 
-						  height=L3, 
-						  pos = ((L3/2)+0.4,0,0),
-						  c="green", 
-						  alpha=.8, 
-						  axis=(1,0,0)
-						  )
+	link3_mesh = createLinkMesh(L3, "green")
 
-	r3 = 0.4
-	sphere3 = Sphere(r=r3).pos(0,0,0).color("gray").alpha(.8)
+	sphere3 = createJointMesh()
 
 	Frame3 = Frame3Arrows + link3_mesh + sphere3
 	
 	# Transform the part to position it at its correct location and orientation 
-	Frame3.apply_transform(T_03)  
+	Frame3.apply_transform(LinearTransform(toVtkMatrix4x4(T_03, out=_FRAME_VTK_MATRICES[2])))  
+
+	# The end-effector frame only shows its axes
+	Frame4 = createCoordinateFrameMesh()
+
+	Frame4.apply_transform(LinearTransform(toVtkMatrix4x4(T_04, out=_FRAME_VTK_MATRICES[3])))
+
+	return Frame1, Frame2, Frame3, Frame4
+	
+def getAxes():
+	"""Returns the axes of the scene (built on first call, then shared)
+	Args:
+	  No input args
+	Returns:
+	  vedo.Axes object 
+	  
+	"""
+	global _AXES
+	
+	if _AXES is None:
+		# Set the limits of the graph x, y, and z ranges 
+		_AXES = Axes(xrange=(0,20), yrange=(-2,20), zrange=(0,6))
+		
+	return _AXES
 
 
-	R_34 = RotationMatrix(phi4, axis_name = 'z')   # Rotation matrix
-	p4   = np.array([[L3 +0.4],[0.0], [0.0]])           # Frame's origin (w.r.t. previous frame)
-	t_34 = p4
+def main():
 
-	T_34 = getLocalFrameMatrix(R_34, t_34)
+	axes = getAxes()
 
-	T_04 = T_01 @ T_12 @ T_23 @ T_34
+	# Lengths of arm parts 
+	L1 = 5   # Length of link 1
+	L2 = 8   # Length of link 2
+	L3 = 3
+	L4 = 0
 
-	x = (T_04 @ np.array([[0], [0], [0], [1]]))[:3].flatten()
-	#x = x + [-0.25711504, -0.30641778, 0]
+	# Joint angles 
+	phi1 = 30     # Rotation angle of part 1 in degrees
+	phi2 =-50    # Rotation angle of part 2 in degrees
+	phi3 = -30      # Rotation angle of the end-effector in degrees
+	phi4 = 0
+	
+	# Matrices of Frames 1 to 4 w.r.t. Frame 0 (i.e., the world frame) 
+	Phi = np.array([phi1, phi2, phi3, phi4])
+	T_01, T_02, T_03, T_04, x = forward_kinematics(Phi, L1, L2, L3, L4)
 	print(x)
 
-	Frame4 = createCoordinateFrameMesh()
-
-	Frame4.apply_transform(T_04)
+	# Meshes of each frame, placed by the matrices above
+	Frames = fk_build_meshes([T_01, T_02, T_03, T_04], [L1, L2, L3])
 
 
 	# Show everything 
-	show([Frame1, Frame2, Frame3, Frame4], axes, viewup="z").close()
+	show(Frames, axes, viewup="z").close()
 
 if __name__ == '__main__':
 	main()
@@ -11,6 +11,8 @@ from unittest.mock import patch
 import cvxopt
 from cvxopt import matrix, printing
 
+from vedo import Cylinder, LinearTransform
+
 from robot3D_basic_solution import *
 
 
@@ -52,6 +54,152 @@ class TestRobotArm(unittest.TestCase):
 
 		assert np.allclose(expected, actual)
 
+	def test_getLocalFrameMatrix(self):
+
+		R = RotationMatrix(30, 'z')
+		expected = np.array([[np.sqrt(3)/2, -0.5,         0, 3],
+							 [0.5,          np.sqrt(3)/2, 0, 2],
+							 [0,            0,            1, 0],
+							 [0,            0,            0, 1]])
+
+		# Translation as a list, a flat array or a column vector
+		for t in ([3, 2, 0], np.array([3., 2., 0.]), np.array([[3.], [2.], [0.]])):
+			T = getLocalFrameMatrix(R, t)
+			assert T.dtype == np.float64
+			assert np.allclose(expected, T)
+
+		# float32 inputs are kept in float32
+		T = getLocalFrameMatrix(R.astype(np.float32), np.array([3, 2, 0], dtype=np.float32))
+		assert T.dtype == np.float32
+		assert np.allclose(expected, T)
+
+	def test_toVtkMatrix4x4(self):
+
+		T = np.arange(16, dtype=np.float32).reshape(4, 4)
+		M = toVtkMatrix4x4(T)
+
+		for i in range(4):
+			for j in range(4):
+				assert M.GetElement(i, j) == T[i, j]
+
+		# Updating in place returns the same matrix
+		assert toVtkMatrix4x4(2 * T, out=M) is M
+		assert M.GetElement(1, 2) == 2 * T[1, 2]
+
+	def test_fk_build_meshes_reuse(self):
+
+		# Lengths of the parts
+		L1, L2, L3, L4 = [5, 8, 3, 0]
+		T_01, T_02, T_03, T_04, e = forward_kinematics(np.array([30, -50, -30, 0]), L1, L2, L3, L4)
+		Frames = fk_build_meshes([T_01, T_02, T_03, T_04], [L1, L2, L3])
+		bounds = [F.bounds() for F in Frames]
+
+		# Building another arm must not move the frames built before
+		T_01, T_02, T_03, T_04, e = forward_kinematics(np.array([-30, 50, 30, 0]), L1, L2, L3, L4)
+		fk_build_meshes([T_01, T_02, T_03, T_04], [L1, L2, L3])
+
+		for F, b in zip(Frames, bounds):
+			assert np.allclose(F.bounds(), b)
+
+	def test_createLinkMesh(self):
+
+		# Scaled unit cylinder must match the parametric cylinder of each length
+		for L, color in [(3, "green"), (5, "yellow"), (8, "red"), (2.5, "blue")]:
+			expected = Cylinder(r=0.4, height=L, pos=((L/2)+0.4, 0, 0), axis=(1, 0, 0))
+			assert np.allclose(createLinkMesh(L, color).bounds(), expected.bounds())
+
+	def test_cached_meshes_are_clones(self):
+
+		T = np.eye(4)
+		T[:3, 3] = [5, 5, 5]
+
+		for create in (createCoordinateFrameMesh, createJointMesh, lambda: createLinkMesh(5, "red")):
+			bounds = create().bounds()
+
+			# Moving a returned mesh must leave the cached template untouched
+			create().apply_transform(LinearTransform(T))
+			assert np.allclose(create().bounds(), bounds)
+
+	def test_createCoordinateFrameMesh_colors(self):
+
+		F = createCoordinateFrameMesh()
+		F.apply_transform(LinearTransform(np.eye(4)))
+
+		# Red, green and blue arrows and a black origin dot
+		actual = {tuple(c) for c in F.clone().celldata["CellsRGBA"]}
+		expected = {(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255), (0, 0, 0, 255)}
+
+		assert actual == expected
+
+	def test_forward_kinematics_matrices(self):
+
+		# Lengths of the parts
+		L1, L2, L3, L4 = [4, 6, 2, 0]
+		Phi = np.array([45, 10, -75, 20])
+		T_01, T_02, T_03, T_04, e = forward_kinematics(Phi, L1, L2, L3, L4)
+
+		for T in (T_01, T_02, T_03, T_04):
+			assert isinstance(T, np.ndarray) and T.shape == (4, 4)
+			assert np.allclose(T[:3, :3] @ T[:3, :3].T, np.eye(3), atol=1e-6)
+			assert np.allclose(T[3], [0, 0, 0, 1])
+
+	def test_forward_kinematics_wrong_Phi(self):
+
+		# Lengths of the parts
+		L1, L2, L3, L4 = [2.5, 7, 1, 0]
+		fk = make_fk(L1, L2, L3)
+
+		for Phi in (np.array([30.]), np.array([30, -50, -30]), np.zeros((2, 4))):
+			with self.assertRaises(ValueError):
+				forward_kinematics(Phi, L1, L2, L3, L4)
+			with self.assertRaises(ValueError):
+				fk(Phi)
+
+	def test_make_fk(self):
+
+		# Lengths of the parts
+		L1, L2, L3 = [6, 4, 2.5]
+		fk = make_fk(L1, L2, L3)
+
+		for Phi in ([0, 0, 0, 0], [30, -50, -30, 0], [-120, 15, 90, 45]):
+
+			# Reference chain built from the float64 helpers
+			T = np.eye(4)
+			expected = []
+			for phi, t in zip(Phi, [[3, 2, 0], [L1 + 0.8, 0, 0], [L2 + 0.8, 0, 0], [L3 + 0.4, 0, 0]]):
+				T = T @ getLocalFrameMatrix(RotationMatrix(phi, 'z'), t)
+				expected.append(T)
+			expected.append(T[:3, 3])
+
+			for actual, expected_i in zip(fk(np.array(Phi)), expected):
+				assert np.allclose(expected_i, actual, atol=1e-5)
+
+	def test_forward_kinematics_batch(self):
+
+		# Lengths of the parts
+		L1, L2, L3, L4 = [4, 6, 2, 0]
+		Phi = np.array([[30, -50, -30, 0],
+						[0, 0, 0, 0],
+						[-30, 50, 30, 0]])
+		T, e = forward_kinematics_batch(Phi, [L1, L2, L3])
+
+		for b in range(len(Phi)):
+			T_01, T_02, T_03, T_04, e_b = forward_kinematics(Phi[b], L1, L2, L3, L4)
+			assert np.allclose(np.stack([T_01, T_02, T_03, T_04]), T[b], atol=1e-6)
+			assert np.allclose(e_b, e[b])
+
+	def test_forward_kinematics_batch_shape(self):
+
+		# Lengths of the parts
+		L1, L2, L3 = [3, 3, 3]
+
+		T, e = forward_kinematics_batch([[30, -50, -30, 0]], [L1, L2, L3])
+		assert T.shape == (1, 4, 4, 4) and e.shape == (1, 3)
+
+		for Phi in (np.array([30, -50, -30, 0]), np.zeros((2, 3)), np.zeros((2, 2, 4))):
+			with self.assertRaises(ValueError):
+				forward_kinematics_batch(Phi, [L1, L2, L3])
+
 
 
 if __name__ == '__main__':